@@ -5,7 +5,11 @@ Loads all Azure service endpoints and deployment names from environment
 variables. Supports .env files for local development.
 """
 
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import lru_cache
+from typing import Annotated, Any
+
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -15,6 +19,7 @@ class Settings(BaseSettings):
         env_file=".env",
         env_file_encoding="utf-8",
         case_sensitive=False,
+        frozen=True,
     )
 
     # Azure OpenAI
@@ -30,16 +35,27 @@ class Settings(BaseSettings):
     # Application Insights
     applicationinsights_connection_string: str = ""
 
+    # OpenTelemetry batch span processor
+    otel_max_queue_size: int = 4096
+    otel_schedule_delay_ms: int = 1000
+    otel_max_export_batch_size: int = 256
+    otel_export_timeout_ms: int = 10000
+
     # App
     log_level: str = "INFO"
-    allowed_origins: str = "http://localhost:3000"
+    # NoDecode: the env value is a comma-separated string, not JSON
+    allowed_origins: Annotated[list[str], NoDecode] = ["http://localhost:3000"]
 
-    @property
-    def cors_origins(self) -> list[str]:
+    @field_validator("allowed_origins", mode="before")
+    @classmethod
+    def _split_origins(cls, value: Any) -> Any:
         """Parse comma-separated CORS origins into a list."""
-        return [origin.strip() for origin in self.allowed_origins.split(",")]
+        if isinstance(value, str):
+            return [origin.strip() for origin in value.split(",")]
+        return value
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """Factory for cached settings instance."""
     return Settings()
@@ -6,19 +6,19 @@ In production, tokens are validated by APIM/EasyAuth before reaching
 this layer — this module parses the pre-validated claims.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 
 from fastapi import Depends, HTTPException, Request, status
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class UserClaims:
     """Parsed user claims from Entra ID JWT token."""
 
     user_id: str
     name: str
     email: str
-    groups: list[str] = field(default_factory=list)
+    groups: tuple[str, ...] = ()
 
 
 def get_current_user(request: Request) -> UserClaims:
@@ -36,7 +36,7 @@ def get_current_user(request: Request) -> UserClaims:
     if user_id:
         # Production path: extract claims from EasyAuth headers
         groups_header = request.headers.get("X-MS-CLIENT-PRINCIPAL-GROUPS", "")
-        groups = [g.strip() for g in groups_header.split(",") if g.strip()]
+        groups = tuple(filter(None, map(str.strip, groups_header.split(","))))
         return UserClaims(
             user_id=user_id,
             name=user_name,
@@ -49,7 +49,7 @@ def get_current_user(request: Request) -> UserClaims:
         user_id="dev-user-001",
         name="Developer",
         email="dev@localhost",
-        groups=["all-employees"],
+        groups=("all-employees",),
     )
 
 
@@ -7,25 +7,32 @@ Configures distributed tracing and custom metrics for the RAG pipeline.
 import logging
 
 from opentelemetry import trace
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanExporter
+
+from app.core.config import Settings
 
 logger = logging.getLogger(__name__)
 
 _tracer: trace.Tracer | None = None
 
 
-def setup_telemetry(connection_string: str) -> None:
+def setup_telemetry(settings: Settings) -> None:
     """
     Initialize OpenTelemetry with Application Insights exporter.
 
     Args:
-        connection_string: Application Insights connection string.
-                          If empty, telemetry is disabled (local dev).
+        settings: Application settings. If the Application Insights
+                  connection string is empty, telemetry is disabled (local dev).
     """
     global _tracer
 
+    # The SDK is only needed to configure the provider; the rest of the app
+    # uses the lightweight opentelemetry API via get_tracer().
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    connection_string = settings.applicationinsights_connection_string
+
     resource = Resource.create({"service.name": "security-policy-assistant"})
     provider = TracerProvider(resource=resource)
 
@@ -38,7 +45,15 @@ def setup_telemetry(connection_string: str) -> None:
             exporter = AzureMonitorTraceExporter(
                 connection_string=connection_string
             )
-            provider.add_span_processor(BatchSpanExporter(exporter))
+            provider.add_span_processor(
+                BatchSpanProcessor(
+                    exporter,
+                    max_queue_size=settings.otel_max_queue_size,
+                    schedule_delay_millis=settings.otel_schedule_delay_ms,
+                    max_export_batch_size=settings.otel_max_export_batch_size,
+                    export_timeout_millis=settings.otel_export_timeout_ms,
+                )
+            )
             logger.info("Application Insights telemetry enabled.")
         except ImportError:
             logger.warning(
@@ -0,0 +1,81 @@
+"""
+Entra ID token warm-up for the shared service credential.
+
+Fetches access tokens for Azure OpenAI and Azure AI Search at startup so the
+first request does not pay the managed identity round-trip, then keeps them
+fresh in the background ahead of expiry.
+"""
+
+import asyncio
+import logging
+import time
+
+from azure.core.credentials_async import AsyncTokenCredential
+from azure.core.exceptions import AzureError
+
+logger = logging.getLogger(__name__)
+
+TOKEN_SCOPES = (
+    "https://cognitiveservices.azure.com/.default",
+    "https://search.azure.com/.default",
+)
+
+# Refresh this long before the earliest token expires
+REFRESH_MARGIN_SECONDS = 300
+
+# Retry interval when a token fetch fails (e.g. no identity available locally)
+RETRY_INTERVAL_SECONDS = 60
+
+
+async def prefetch_tokens(credential: AsyncTokenCredential) -> int | None:
+    """
+    Fetch tokens for all service scopes so the credential cache is warm.
+
+    Args:
+        credential: The credential shared by the service clients.
+
+    Returns:
+        Earliest expiry (epoch seconds) among the fetched tokens, or None
+        if any fetch failed.
+    """
+    try:
+        tokens = await asyncio.gather(
+            *(credential.get_token(scope) for scope in TOKEN_SCOPES)
+        )
+    except AzureError as exc:
+        logger.warning("Entra ID token prefetch failed: %s", exc)
+        return None
+
+    expires_on = min(token.expires_on for token in tokens)
+    logger.info(
+        "Entra ID tokens prefetched; earliest expiry in %ds.",
+        expires_on - time.time(),
+    )
+    return expires_on
+
+
+async def refresh_tokens(
+    credential: AsyncTokenCredential, expires_on: int | None
+) -> None:
+    """
+    Re-fetch tokens shortly before they expire, until cancelled.
+
+    Args:
+        credential: The credential shared by the service clients.
+        expires_on: Expiry returned by the initial prefetch, if it succeeded.
+    """
+    while True:
+        if expires_on is None:
+            delay = RETRY_INTERVAL_SECONDS
+        else:
+            delay = max(
+                expires_on - time.time() - REFRESH_MARGIN_SECONDS,
+                RETRY_INTERVAL_SECONDS,
+            )
+        await asyncio.sleep(delay)
+        try:
+            expires_on = await prefetch_tokens(credential)
+        except Exception:
+            # Keep refreshing; a transport error must not end the task
+            logger.exception("Unexpected error refreshing Entra ID tokens.")
+            expires_on = None
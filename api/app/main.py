@@ -5,14 +5,17 @@ Registers routers, configures CORS, initializes telemetry,
 and creates service instances on startup.
 """
 
+import asyncio
 import logging
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
+from azure.identity.aio import DefaultAzureCredential
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import get_settings
 from app.core.telemetry import setup_telemetry
+from app.core.tokens import prefetch_tokens, refresh_tokens
 from app.routers import chat, health
 from app.services.openai_client import OpenAIService
 from app.services.rag import RAGOrchestrator
@@ -33,11 +36,23 @@ async def lifespan(application: FastAPI):
     logging.basicConfig(level=settings.log_level)
 
     # Initialize telemetry
-    setup_telemetry(settings.applicationinsights_connection_string)
+    setup_telemetry(settings)
+
+    # Initialize service clients with one shared credential so the
+    # Entra ID token cache and credential chain probing are shared.
+    # Client construction (HTTP pipelines, TLS contexts) runs in worker
+    # threads while the token cache is warmed, so cold start pays for
+    # the slowest step rather than their sum.
+    credential = DefaultAzureCredential()
+    search_service, openai_service, expires_on = await asyncio.gather(
+        asyncio.to_thread(PolicySearchService, settings, credential),
+        asyncio.to_thread(OpenAIService, settings, credential),
+        prefetch_tokens(credential),
+    )
+
+    # Keep the token cache fresh ahead of expiry
+    token_refresher = asyncio.create_task(refresh_tokens(credential, expires_on))
 
-    # Initialize service clients
-    search_service = PolicySearchService(settings)
-    openai_service = OpenAIService(settings)
     rag_orchestrator = RAGOrchestrator(search_service, openai_service)
 
     # Store in app state for dependency injection
@@ -46,6 +61,13 @@ async def lifespan(application: FastAPI):
     logger.info("Security Policy Assistant API started.")
     yield
     logger.info("Security Policy Assistant API shutting down.")
+    # Let an in-flight token fetch unwind before the credential is closed
+    token_refresher.cancel()
+    with suppress(asyncio.CancelledError):
+        await token_refresher
+    await openai_service.close()
+    await search_service.close()
+    await credential.close()
 
 
 app = FastAPI(
@@ -59,7 +81,7 @@ app = FastAPI(
 settings = get_settings()
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.cors_origins,
+    allow_origins=settings.allowed_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -5,29 +5,29 @@ Receives user questions, runs the RAG pipeline, and returns
 grounded answers with citations.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
 
 from app.core.security import UserClaims, get_current_user
 from app.models.chat import ChatRequest, ChatResponse
+from app.services.rag import RAGOrchestrator
 
 router = APIRouter(tags=["chat"])
 
 
-def get_rag_orchestrator():
+def get_rag_orchestrator(request: Request) -> RAGOrchestrator:
     """
     Dependency injection for the RAG orchestrator.
     Initialized once in main.py and stored in app.state.
     """
-    from app.main import app
-
-    return app.state.rag_orchestrator
+    return request.app.state.rag_orchestrator
 
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
     user: UserClaims = Depends(get_current_user),
-    rag=Depends(get_rag_orchestrator),
+    rag: RAGOrchestrator = Depends(get_rag_orchestrator),
 ) -> ChatResponse:
     """
     Ask the Security Policy Assistant a question.
@@ -39,3 +39,22 @@ async def chat(
     4. Verifies citations before returning the response.
     """
     return await rag.answer(messages=request.messages, user=user)
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    user: UserClaims = Depends(get_current_user),
+    rag: RAGOrchestrator = Depends(get_rag_orchestrator),
+) -> StreamingResponse:
+    """
+    Ask the Security Policy Assistant a question, streaming the answer.
+
+    Returns Server-Sent Events: a ``token`` event per generated fragment,
+    then a ``done`` event with the verified ChatResponse (citations,
+    retrieval count). Clients should render the ``done`` answer as final.
+    """
+    return StreamingResponse(
+        rag.answer_stream(messages=request.messages, user=user),
+        media_type="text/event-stream",
+    )
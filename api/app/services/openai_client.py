@@ -5,37 +5,52 @@ Handles embedding generation and chat completions with retry logic.
 Uses DefaultAzureCredential (Managed Identity in production, az login locally).
 """
 
+import hashlib
 import logging
+from collections.abc import AsyncIterator
 
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-from openai import AzureOpenAI
+from azure.core.credentials_async import AsyncTokenCredential
+from azure.identity.aio import get_bearer_token_provider
+from cachetools import TTLCache
 
 from app.core.config import Settings
 from app.core.telemetry import get_tracer
 
 logger = logging.getLogger(__name__)
 
+# Query embeddings are deterministic, so repeated questions can reuse them
+EMBED_CACHE_SIZE = 2048
+EMBED_CACHE_TTL_SECONDS = 600
+
 
 class OpenAIService:
     """Wrapper around Azure OpenAI for embeddings and chat completions."""
 
-    def __init__(self, settings: Settings) -> None:
+    def __init__(self, settings: Settings, credential: AsyncTokenCredential) -> None:
         self._settings = settings
         self._tracer = get_tracer()
+        self._embed_cache: TTLCache = TTLCache(
+            maxsize=EMBED_CACHE_SIZE, ttl=EMBED_CACHE_TTL_SECONDS
+        )
 
         # Use Entra ID token-based auth (no API keys)
+        self._credential = credential
         token_provider = get_bearer_token_provider(
-            DefaultAzureCredential(),
+            credential,
             "https://cognitiveservices.azure.com/.default",
         )
 
-        self._client = AzureOpenAI(
+        # Imported here: the openai package takes ~0.5s to import, and the
+        # lifespan builds this service in a worker thread alongside token prefetch
+        from openai import AsyncAzureOpenAI
+
+        self._client = AsyncAzureOpenAI(
             azure_endpoint=settings.azure_openai_endpoint,
             azure_ad_token_provider=token_provider,
             api_version=settings.azure_openai_api_version,
         )
 
-    def embed_text(self, text: str) -> list[float]:
+    async def embed_text(self, text: str) -> list[float]:
         """
         Generate an embedding vector for the given text.
 
@@ -45,15 +60,22 @@ class OpenAIService:
         Returns:
             A list of floats representing the embedding vector.
         """
+        key = self._embed_cache_key(text)
+        cached = self._embed_cache.get(key)
+        if cached is not None:
+            return cached
+
         with self._tracer.start_as_current_span("openai.embed") as span:
             span.set_attribute("openai.model", self._settings.azure_openai_embedding_deployment)
-            response = self._client.embeddings.create(
+            response = await self._client.embeddings.create(
                 input=[text],
                 model=self._settings.azure_openai_embedding_deployment,
             )
-            return response.data[0].embedding
+            embedding = response.data[0].embedding
+            self._embed_cache[key] = embedding
+            return embedding
 
-    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+    async def embed_batch(self, texts: list[str]) -> list[list[float]]:
         """
         Generate embeddings for a batch of texts.
 
@@ -63,15 +85,25 @@ class OpenAIService:
         Returns:
             List of embedding vectors (same order as input).
         """
+        keys = [self._embed_cache_key(text) for text in texts]
+        embeddings = [self._embed_cache.get(key) for key in keys]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if not missing:
+            return embeddings
+
         with self._tracer.start_as_current_span("openai.embed_batch") as span:
             span.set_attribute("openai.batch_size", len(texts))
-            response = self._client.embeddings.create(
-                input=texts,
+            span.set_attribute("openai.cache_misses", len(missing))
+            response = await self._client.embeddings.create(
+                input=[texts[i] for i in missing],
                 model=self._settings.azure_openai_embedding_deployment,
             )
-            return [item.embedding for item in response.data]
+            for i, item in zip(missing, response.data):
+                embeddings[i] = item.embedding
+                self._embed_cache[keys[i]] = item.embedding
+            return embeddings
 
-    def chat_completion(
+    async def chat_completion(
         self,
         messages: list[dict[str, str]],
         temperature: float = 0.0,
@@ -90,21 +122,75 @@ class OpenAIService:
             span.set_attribute("openai.model", self._settings.azure_openai_chat_deployment)
             span.set_attribute("openai.temperature", temperature)
 
-            response = self._client.chat.completions.create(
+            response = await self._client.chat.completions.create(
                 model=self._settings.azure_openai_chat_deployment,
                 messages=messages,
                 temperature=temperature,
             )
 
             answer = response.choices[0].message.content or ""
+            u = response.usage
+            if u is None:
+                prompt_tokens = completion_tokens = total_tokens = 0
+            else:
+                prompt_tokens = u.prompt_tokens
+                completion_tokens = u.completion_tokens
+                total_tokens = u.total_tokens
             usage = {
-                "prompt_tokens": response.usage.prompt_tokens if response.usage else 0,
-                "completion_tokens": response.usage.completion_tokens if response.usage else 0,
-                "total_tokens": response.usage.total_tokens if response.usage else 0,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": total_tokens,
             }
 
-            span.set_attribute("openai.prompt_tokens", usage["prompt_tokens"])
-            span.set_attribute("openai.completion_tokens", usage["completion_tokens"])
-            logger.info("Chat completion: %d tokens used", usage["total_tokens"])
+            span.set_attribute("openai.prompt_tokens", prompt_tokens)
+            span.set_attribute("openai.completion_tokens", completion_tokens)
+            logger.info("Chat completion: %d tokens used", total_tokens)
 
             return answer, usage
+
+    async def chat_completion_stream(
+        self,
+        messages: list[dict[str, str]],
+        temperature: float = 0.0,
+    ) -> AsyncIterator[str]:
+        """
+        Generate a chat completion, yielding content deltas as they arrive.
+
+        Args:
+            messages: The conversation messages (system + user + context).
+            temperature: Sampling temperature (0.0 = deterministic).
+
+        Yields:
+            Fragments of the answer text in generation order.
+        """
+        with self._tracer.start_as_current_span("openai.chat_stream") as span:
+            span.set_attribute("openai.model", self._settings.azure_openai_chat_deployment)
+            span.set_attribute("openai.temperature", temperature)
+
+            stream = await self._client.chat.completions.create(
+                model=self._settings.azure_openai_chat_deployment,
+                messages=messages,
+                temperature=temperature,
+                stream=True,
+            )
+
+            chunk_count = 0
+            async for chunk in stream:
+                # Azure sends content-filter results in chunks without choices
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    chunk_count += 1
+                    yield content
+
+            span.set_attribute("openai.stream_chunks", chunk_count)
+
+    def _embed_cache_key(self, text: str) -> tuple[str, bytes]:
+        """Key embeddings by deployment and a compact digest of the text."""
+        digest = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        return self._settings.azure_openai_embedding_deployment, digest
+
+    async def close(self) -> None:
+        """Close the underlying HTTP client."""
+        await self._client.close()
@@ -10,8 +10,13 @@ Coordinates the full Retrieve → Rank → Generate flow:
 6. Verify citations in the output.
 """
 
+import io
+import json
 import logging
 import re
+from collections.abc import AsyncIterator
+
+from cachetools import TTLCache
 
 from app.core.security import UserClaims
 from app.core.telemetry import get_tracer
@@ -34,6 +39,18 @@ understand internal security policies.
 5. Be concise, accurate, and professional.
 """
 
+_CITATION_RE = re.compile(r"\[doc(\d+)\]")
+
+# Flattens chunk line breaks into spaces in a single pass
+_NEWLINE_TABLE = str.maketrans({"\n": " ", "\r": " "})
+
+# Matches the refusal sentence the system prompt instructs the model to use
+_REFUSAL_RE = re.compile(r"\W*i cannot find", re.IGNORECASE)
+
+# Single-turn answers are cached per (group set, question) for a short window
+RESPONSE_CACHE_SIZE = 512
+RESPONSE_CACHE_TTL_SECONDS = 300
+
 REFUSAL_MESSAGE = (
     "I cannot find this information in the available security policies. "
     "Please contact the Security team for further assistance."
@@ -51,6 +68,9 @@ class RAGOrchestrator:
         self._search = search_service
         self._openai = openai_service
         self._tracer = get_tracer()
+        self._response_cache: TTLCache = TTLCache(
+            maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL_SECONDS
+        )
 
     async def answer(
         self,
@@ -72,16 +92,14 @@ class RAGOrchestrator:
             span.set_attribute("rag.user_id", user.user_id)
             span.set_attribute("rag.query_length", len(user_query))
 
-            # Step 1: Embed the query
-            query_vector = self._openai.embed_text(user_query)
+            cache_key = self._cache_key(messages, user)
+            cached = self._response_cache.get(cache_key) if cache_key else None
+            span.set_attribute("rag.cache_hit", cached is not None)
+            if cached is not None:
+                return cached
 
-            # Step 2: Hybrid search with security trimming
-            results = self._search.hybrid_search(
-                query_text=user_query,
-                query_vector=query_vector,
-                user_groups=user.groups,
-                top_k=5,
-            )
+            # Step 1 + 2: Embed and search with security trimming
+            results = await self._retrieve(user_query, user)
             span.set_attribute("rag.retrieval_count", len(results))
 
             # Step 3: Handle empty retrieval
@@ -90,41 +108,160 @@ class RAGOrchestrator:
                 return ChatResponse(answer=REFUSAL_MESSAGE, retrieval_count=0)
 
             # Step 4: Build grounded prompt
-            context_str, source_map = self._format_context(results)
+            context_str, sources = self._format_context(results)
             llm_messages = self._build_messages(context_str, messages)
 
             # Step 5: Generate answer
-            answer_text, usage = self._openai.chat_completion(llm_messages)
+            answer_text, usage = await self._openai.chat_completion(llm_messages)
             span.set_attribute("rag.tokens_total", usage.get("total_tokens", 0))
 
             # Step 6: Verify citations
-            citations = self._extract_citations(answer_text, source_map)
-            final_answer = self._validate_answer(answer_text, citations)
-
-            return ChatResponse(
-                answer=final_answer,
-                citations=citations,
-                retrieval_count=len(results),
-                model=self._openai._settings.azure_openai_chat_deployment,
+            response = self._build_response(answer_text, sources, len(results))
+            if cache_key:
+                self._response_cache[cache_key] = response
+            return response
+
+    async def answer_stream(
+        self,
+        messages: list[ChatMessage],
+        user: UserClaims,
+    ) -> AsyncIterator[str]:
+        """
+        Process a user question, streaming the answer as Server-Sent Events.
+
+        Emits a ``token`` event per generated fragment, followed by a single
+        ``done`` event carrying the full ChatResponse. Citation verification
+        needs the complete answer, so the ``done`` payload is authoritative:
+        if verification fails its answer is the refusal message.
+
+        Args:
+            messages: Conversation history with the latest user message last.
+            user: Authenticated user claims with group memberships.
+
+        Yields:
+            SSE-formatted event strings.
+        """
+        with self._tracer.start_as_current_span("rag.answer_stream") as span:
+            user_query = messages[-1].content
+            span.set_attribute("rag.user_id", user.user_id)
+            span.set_attribute("rag.query_length", len(user_query))
+
+            cache_key = self._cache_key(messages, user)
+            cached = self._response_cache.get(cache_key) if cache_key else None
+            span.set_attribute("rag.cache_hit", cached is not None)
+            if cached is not None:
+                yield self._sse_event("token", json.dumps({"content": cached.answer}))
+                yield self._sse_event("done", cached.model_dump_json())
+                return
+
+            results = await self._retrieve(user_query, user)
+            span.set_attribute("rag.retrieval_count", len(results))
+
+            if not results:
+                logger.warning("No results retrieved for query from user %s", user.user_id)
+                response = ChatResponse(answer=REFUSAL_MESSAGE, retrieval_count=0)
+                yield self._sse_event("done", response.model_dump_json())
+                return
+
+            context_str, sources = self._format_context(results)
+            llm_messages = self._build_messages(context_str, messages)
+
+            parts: list[str] = []
+            async for delta in self._openai.chat_completion_stream(llm_messages):
+                parts.append(delta)
+                yield self._sse_event("token", json.dumps({"content": delta}))
+
+            response = self._build_response("".join(parts), sources, len(results))
+            if cache_key:
+                self._response_cache[cache_key] = response
+            yield self._sse_event("done", response.model_dump_json())
+
+    @staticmethod
+    def _cache_key(
+        messages: list[ChatMessage],
+        user: UserClaims,
+    ) -> tuple[frozenset[str], str] | None:
+        """
+        Build the response cache key for a request.
+
+        Only single-turn questions are cacheable; with prior history the
+        answer depends on the conversation. Keying on the user's groups keeps
+        security trimming intact across users.
+        """
+        if len(messages) != 1:
+            return None
+        return frozenset(user.groups), messages[0].content
+
+    async def _retrieve(self, user_query: str, user: UserClaims) -> list[SearchResult]:
+        """
+        Run hybrid retrieval with security trimming.
+
+        Falls back to a keyword-only search if the query cannot be embedded,
+        so an embedding outage degrades ranking instead of failing the request.
+        """
+        try:
+            query_vector = await self._openai.embed_text(user_query)
+        except Exception:
+            logger.exception("Query embedding failed; falling back to keyword search.")
+            return await self._search.keyword_search(
+                query_text=user_query,
+                user_groups=user.groups,
+                top_k=5,
             )
 
+        return await self._search.hybrid_search(
+            query_text=user_query,
+            query_vector=query_vector,
+            user_groups=user.groups,
+            top_k=5,
+        )
+
+    def _build_response(
+        self,
+        answer_text: str,
+        sources: list[Source],
+        retrieval_count: int,
+    ) -> ChatResponse:
+        """Verify citations in a generated answer and wrap it in a ChatResponse."""
+        citations = self._extract_citations(answer_text, sources)
+        final_answer = self._validate_answer(answer_text, citations)
+
+        return ChatResponse(
+            answer=final_answer,
+            citations=citations,
+            retrieval_count=retrieval_count,
+            model=self._openai._settings.azure_openai_chat_deployment,
+        )
+
+    @staticmethod
+    def _sse_event(event: str, data: str) -> str:
+        """Format a single Server-Sent Event."""
+        return f"event: {event}\ndata: {data}\n\n"
+
     @staticmethod
     def _format_context(
         results: list[SearchResult],
-    ) -> tuple[str, dict[str, Source]]:
-        """Format retrieved chunks into a context block with doc tags."""
-        parts = []
-        source_map: dict[str, Source] = {}
-        for i, doc in enumerate(results):
-            tag = f"[doc{i + 1}]"
-            content = doc.content.replace("\n", " ").strip()
-            parts.append(f"{tag} (Source: {doc.title}): {content}")
-            source_map[tag] = Source(
-                chunk_id=doc.chunk_id,
-                title=doc.title,
-                source_uri=doc.source_uri,
+    ) -> tuple[str, list[Source]]:
+        """
+        Format retrieved chunks into a context block with doc tags.
+
+        ``sources[i]`` is the source tagged ``[doc{i + 1}]`` in the context.
+        """
+        buf = io.StringIO()
+        sources: list[Source] = []
+        for i, doc in enumerate(results, start=1):
+            if i > 1:
+                buf.write("\n\n")
+            buf.write(f"[doc{i}] (Source: {doc.title}): ")
+            buf.write(doc.content.translate(_NEWLINE_TABLE).strip())
+            sources.append(
+                Source(
+                    chunk_id=doc.chunk_id,
+                    title=doc.title,
+                    source_uri=doc.source_uri,
+                )
             )
-        return "\n\n".join(parts), source_map
+        return buf.getvalue(), sources
 
     @staticmethod
     def _build_messages(
@@ -135,9 +272,9 @@ class RAGOrchestrator:
         messages = [{"role": "system", "content": SYSTEM_PROMPT}]
 
         # Include up to last 4 prior messages for conversational context
-        history = conversation[:-1][-4:]
-        for msg in history:
-            messages.append({"role": msg.role, "content": msg.content})
+        n = len(conversation)
+        history = conversation[max(0, n - 5) : n - 1]
+        messages.extend({"role": msg.role, "content": msg.content} for msg in history)
 
         # User question with retrieved context
         user_query = conversation[-1].content
@@ -152,14 +289,16 @@ class RAGOrchestrator:
     @staticmethod
     def _extract_citations(
         answer: str,
-        source_map: dict[str, Source],
+        sources: list[Source],
     ) -> list[Citation]:
-        """Parse [docN] tags from the answer and map to sources."""
-        found_tags = set(re.findall(r"\[doc\d+\]", answer))
+        """Parse [docN] tags from the answer and map to sources, in order of first use."""
+        seen = [False] * len(sources)
         citations = []
-        for tag in sorted(found_tags):
-            if tag in source_map:
-                citations.append(Citation(tag=tag, source=source_map[tag]))
+        for match in _CITATION_RE.finditer(answer):
+            idx = int(match.group(1)) - 1
+            if 0 <= idx < len(sources) and not seen[idx]:
+                seen[idx] = True
+                citations.append(Citation(tag=match.group(0), source=sources[idx]))
         return citations
 
     @staticmethod
@@ -168,7 +307,7 @@ class RAGOrchestrator:
         Validate that the answer contains citations.
         If no citations are found and it's not already a refusal, append a warning.
         """
-        is_refusal = "cannot find" in answer.lower()
+        is_refusal = _REFUSAL_RE.match(answer) is not None
         if not citations and not is_refusal:
             logger.warning("Answer generated without any citations — potential hallucination.")
             return REFUSAL_MESSAGE
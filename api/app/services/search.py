@@ -7,9 +7,11 @@ and optional semantic reranking.
 
 import logging
 from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
 
-from azure.identity import DefaultAzureCredential
-from azure.search.documents import SearchClient
+from azure.core.credentials_async import AsyncTokenCredential
+from azure.search.documents.aio import SearchClient
 from azure.search.documents.models import (
     QueryType,
     VectorizedQuery,
@@ -21,7 +23,7 @@ from app.core.telemetry import get_tracer
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SearchResult:
     """A single search result from the index."""
 
@@ -32,11 +34,24 @@ class SearchResult:
     score: float
 
 
+@lru_cache(maxsize=1024)
+def _security_filter(groups: tuple[str, ...]) -> str:
+    """Format the OData security filter once per distinct set of groups."""
+    if not groups:
+        return "classification eq 'Public'"
+
+    safe_groups = ",".join(f"'{g}'" for g in groups)
+    return (
+        f"classification eq 'Public' or "
+        f"allowed_groups/any(g: search.in(g, '{safe_groups}'))"
+    )
+
+
 class PolicySearchService:
     """Wrapper around Azure AI Search for policy document retrieval."""
 
-    def __init__(self, settings: Settings) -> None:
-        credential = DefaultAzureCredential()
+    def __init__(self, settings: Settings, credential: AsyncTokenCredential) -> None:
+        self._credential = credential
         self._client = SearchClient(
             endpoint=settings.azure_search_endpoint,
             index_name=settings.azure_search_index_name,
@@ -44,16 +59,19 @@ class PolicySearchService:
         )
         self._tracer = get_tracer()
 
-    def hybrid_search(
+    async def hybrid_search(
         self,
         query_text: str,
         query_vector: list[float],
-        user_groups: list[str],
+        user_groups: tuple[str, ...],
         top_k: int = 5,
     ) -> list[SearchResult]:
         """
         Execute a hybrid search with security trimming.
 
+        The service fuses the keyword and vector results with RRF, then the
+        semantic ranker rescores the top of the fused list.
+
         Args:
             query_text: The user's natural language query.
             query_vector: The embedded query vector.
@@ -64,59 +82,103 @@ class PolicySearchService:
             List of SearchResult ordered by relevance.
         """
         with self._tracer.start_as_current_span("search.hybrid") as span:
-            # Build security filter
-            security_filter = self._build_security_filter(user_groups)
-            span.set_attribute("search.filter", security_filter)
-            span.set_attribute("search.top_k", top_k)
-
-            vector_query = VectorizedQuery(
-                vector=query_vector,
-                k_nearest_neighbors=50,
-                fields="content_vector",
+            return await self._execute(
+                span,
+                user_groups,
+                top_k,
+                search_text=query_text,
+                vector_queries=[self._vector_query(query_vector)],
+                query_type=QueryType.SEMANTIC,
+                semantic_configuration_name="default",
             )
 
-            results = self._client.search(
+    async def keyword_search(
+        self,
+        query_text: str,
+        user_groups: tuple[str, ...],
+        top_k: int = 5,
+    ) -> list[SearchResult]:
+        """
+        Execute a keyword search with semantic reranking.
+
+        Needs no query vector, so it serves as the fallback when the query
+        cannot be embedded.
+
+        Args:
+            query_text: The user's natural language query.
+            user_groups: Entra ID group IDs for security filtering.
+            top_k: Number of results to return.
+
+        Returns:
+            List of SearchResult ordered by relevance.
+        """
+        with self._tracer.start_as_current_span("search.keyword") as span:
+            return await self._execute(
+                span,
+                user_groups,
+                top_k,
                 search_text=query_text,
-                vector_queries=[vector_query],
-                filter=security_filter,
-                select=["id", "content", "title", "source_uri"],
                 query_type=QueryType.SEMANTIC,
                 semantic_configuration_name="default",
-                top=top_k,
             )
 
-            search_results = []
-            for doc in results:
-                search_results.append(
-                    SearchResult(
-                        chunk_id=doc["id"],
-                        content=doc["content"],
-                        title=doc.get("title", "Unknown"),
-                        source_uri=doc.get("source_uri", ""),
-                        score=doc.get("@search.score", 0.0),
-                    )
-                )
+    async def close(self) -> None:
+        """Close the underlying search client."""
+        await self._client.close()
+
+    async def _execute(
+        self,
+        span: Any,
+        user_groups: tuple[str, ...],
+        top_k: int,
+        **query: Any,
+    ) -> list[SearchResult]:
+        """Run a security-trimmed query and materialize the results."""
+        security_filter = self._build_security_filter(user_groups)
+        span.set_attribute("search.filter", security_filter)
+        span.set_attribute("search.top_k", top_k)
+
+        results = await self._client.search(
+            filter=security_filter,
+            select=["id", "content", "title", "source_uri"],
+            top=top_k,
+            **query,
+        )
 
-            span.set_attribute("search.results_count", len(search_results))
-            logger.info(
-                "Hybrid search returned %d results (filter: %s)",
-                len(search_results),
-                security_filter,
+        search_results = []
+        async for doc in results:
+            search_results.append(
+                SearchResult(
+                    chunk_id=doc["id"],
+                    content=doc["content"],
+                    title=doc.get("title", "Unknown"),
+                    source_uri=doc.get("source_uri", ""),
+                    score=doc.get("@search.score", 0.0),
+                )
             )
-            return search_results
+
+        span.set_attribute("search.results_count", len(search_results))
+        logger.info(
+            "Search returned %d results (filter: %s)",
+            len(search_results),
+            security_filter,
+        )
+        return search_results
+
+    @staticmethod
+    def _vector_query(query_vector: list[float]) -> VectorizedQuery:
+        """Build the k-NN query against the content vector field."""
+        return VectorizedQuery(
+            vector=query_vector,
+            k_nearest_neighbors=50,
+            fields="content_vector",
+        )
 
     @staticmethod
-    def _build_security_filter(user_groups: list[str]) -> str:
+    def _build_security_filter(user_groups: tuple[str, ...]) -> str:
         """
         Build an OData security filter from Entra ID group claims.
 
         Returns documents that are either Public or match the user's groups.
         """
-        if not user_groups:
-            return "classification eq 'Public'"
-
-        safe_groups = ",".join(f"'{g}'" for g in user_groups)
-        return (
-            f"classification eq 'Public' or "
-            f"allowed_groups/any(g: search.in(g, '{safe_groups}'))"
-        )
+        return _security_filter(tuple(sorted(user_groups)))
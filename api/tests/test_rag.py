@@ -7,7 +7,7 @@ Tests the core pipeline logic with mocked Azure services.
 import pytest
 
 from app.core.security import UserClaims
-from app.models.chat import ChatMessage
+from app.models.chat import ChatMessage, ChatResponse
 from app.services.rag import RAGOrchestrator, REFUSAL_MESSAGE
 
 
@@ -26,7 +26,14 @@ class MockSearchService:
     def __init__(self, results=None):
         self._results = results or []
 
-    def hybrid_search(self, query_text, query_vector, user_groups, top_k=5):
+        self.calls = []
+
+    async def hybrid_search(self, query_text, query_vector, user_groups, top_k=5):
+        self.calls.append("hybrid")
+        return self._results
+
+    async def keyword_search(self, query_text, user_groups, top_k=5):
+        self.calls.append("keyword")
         return self._results
 
 
@@ -35,15 +42,21 @@ class MockOpenAIService:
 
     def __init__(self, answer="Test answer [doc1]", embedding=None):
         self._answer = answer
+        self.chat_calls = 0
         self._embedding = embedding or [0.1] * 1536
         self._settings = type("S", (), {"azure_openai_chat_deployment": "gpt-4o"})()
 
-    def embed_text(self, text):
+    async def embed_text(self, text):
         return self._embedding
 
-    def chat_completion(self, messages, temperature=0.0):
+    async def chat_completion(self, messages, temperature=0.0):
+        self.chat_calls += 1
         return self._answer, {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150}
 
+    async def chat_completion_stream(self, messages, temperature=0.0):
+        for word in self._answer.split(" "):
+            yield word + " "
+
 
 @pytest.fixture
 def user():
@@ -51,7 +64,7 @@ def user():
         user_id="test-user",
         name="Test User",
         email="test@example.com",
-        groups=["all-employees"],
+        groups=("all-employees",),
     )
 
 
@@ -89,6 +102,26 @@ async def test_answer_with_citations(user, sample_results):
     assert len(response.citations) == 1
     assert response.citations[0].tag == "[doc1]"
     assert response.retrieval_count == 2
+    assert search.calls == ["hybrid"]
+
+
+@pytest.mark.asyncio
+async def test_embedding_failure_falls_back_to_keyword_search(user, sample_results):
+    """Test that retrieval still runs when the query cannot be embedded."""
+
+    class FailingOpenAIService(MockOpenAIService):
+        async def embed_text(self, text):
+            raise RuntimeError("embedding deployment unavailable")
+
+    search = MockSearchService(results=sample_results)
+    openai = FailingOpenAIService(answer="Passwords must be 12 characters [doc1].")
+    rag = RAGOrchestrator(search, openai)
+
+    messages = [ChatMessage(role="user", content="What is the password policy?")]
+    response = await rag.answer(messages, user)
+
+    assert search.calls == ["keyword"]
+    assert response.citations[0].tag == "[doc1]"
 
 
 @pytest.mark.asyncio
@@ -118,6 +151,42 @@ async def test_no_citations_triggers_refusal(user, sample_results):
     assert response.answer == REFUSAL_MESSAGE
 
 
+@pytest.mark.asyncio
+async def test_answer_stream_emits_tokens_then_done(user, sample_results):
+    """Test that streaming yields token events and a final verified response."""
+    search = MockSearchService(results=sample_results)
+    openai = MockOpenAIService(answer="Passwords must be 12 characters [doc1].")
+    rag = RAGOrchestrator(search, openai)
+
+    messages = [ChatMessage(role="user", content="What is the password policy?")]
+    events = [event async for event in rag.answer_stream(messages, user)]
+
+    assert all(e.startswith("event: token\n") for e in events[:-1])
+    assert events[-1].startswith("event: done\n")
+    done = ChatResponse.model_validate_json(events[-1].split("data: ", 1)[1])
+    assert done.citations[0].tag == "[doc1]"
+    assert done.retrieval_count == 2
+
+
+@pytest.mark.asyncio
+async def test_repeated_question_served_from_cache(user, sample_results):
+    """Test that a repeated single-turn question skips the pipeline."""
+    search = MockSearchService(results=sample_results)
+    openai = MockOpenAIService(answer="Passwords must be 12 characters [doc1].")
+    rag = RAGOrchestrator(search, openai)
+
+    messages = [ChatMessage(role="user", content="What is the password policy?")]
+    first = await rag.answer(messages, user)
+    second = await rag.answer(messages, user)
+
+    assert second == first
+    assert openai.chat_calls == 1
+
+    other_user = UserClaims(user_id="u2", name="", email="", groups=("finance",))
+    await rag.answer(messages, other_user)
+    assert openai.chat_calls == 2
+
+
 @pytest.mark.asyncio
 async def test_format_context():
     """Test context formatting produces correct doc tags."""
@@ -130,5 +199,36 @@ async def test_format_context():
     assert "[doc1]" in context
     assert "[doc2]" in context
     assert "Doc1.pdf" in context
-    assert "[doc1]" in sources
-    assert sources["[doc1]"].chunk_id == "c1"
+    assert len(sources) == 2
+    assert sources[0].chunk_id == "c1"
+
+
+def test_extract_citations_in_order_of_first_use(sample_results):
+    """Test citations follow first appearance and ignore repeats and unknown tags."""
+    _, sources = RAGOrchestrator._format_context(sample_results)
+    answer = "MFA is required [doc2]. Passwords need 12 characters [doc1][doc2][doc9][doc0]."
+
+    citations = RAGOrchestrator._extract_citations(answer, sources)
+
+    assert [c.tag for c in citations] == ["[doc2]", "[doc1]"]
+
+
+def test_validate_answer_keeps_model_refusal():
+    """Test that the model's own refusal is returned unchanged."""
+    answer = "I cannot find this information in the available security policies."
+
+    assert RAGOrchestrator._validate_answer(answer, []) == answer
+    assert RAGOrchestrator._validate_answer(f'"{answer}"', []) == f'"{answer}"'
+
+
+def test_build_messages_keeps_last_four_prior_messages():
+    """Test that only the four most recent prior messages are sent as history."""
+    conversation = [
+        ChatMessage(role="user" if i % 2 == 0 else "assistant", content=f"m{i}")
+        for i in range(7)
+    ]
+
+    messages = RAGOrchestrator._build_messages("ctx", conversation)
+
+    assert [m["content"] for m in messages[1:-1]] == ["m2", "m3", "m4", "m5"]
+    assert messages[-1]["content"].endswith("m6")
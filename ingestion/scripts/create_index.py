@@ -16,6 +16,9 @@ from azure.search.documents.indexes import SearchIndexClient
 from azure.search.documents.indexes.models import (
     HnswAlgorithmConfiguration,
     HnswParameters,
+    RescoringOptions,
+    ScalarQuantizationCompression,
+    ScalarQuantizationParameters,
     SearchableField,
     SearchField,
     SearchFieldDataType,
@@ -57,7 +60,9 @@ def create_index() -> None:
         ),
         SearchField(
             name="content_vector",
-            type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
+            # float16 storage: half the index memory of Single, and the
+            # ingestion client uploads vectors at half precision to match
+            type=SearchFieldDataType.Collection(SearchFieldDataType.Half),
             searchable=True,
             vector_search_dimensions=1536,
             vector_search_profile_name="hnsw-cosine-profile",
@@ -103,15 +108,30 @@ def create_index() -> None:
             VectorSearchProfile(
                 name="hnsw-cosine-profile",
                 algorithm_configuration_name="hnsw-config",
+                compression_name="sq-int8",
+            ),
+        ],
+        # The HNSW graph is built over int8-quantized vectors (2x smaller
+        # than the stored float16, faster distance computations); the
+        # float16 originals are kept to rescore the oversampled candidates.
+        compressions=[
+            ScalarQuantizationCompression(
+                compression_name="sq-int8",
+                parameters=ScalarQuantizationParameters(quantized_data_type="int8"),
+                rescoring_options=RescoringOptions(enable_rescoring=True),
             ),
         ],
         algorithms=[
             HnswAlgorithmConfiguration(
                 name="hnsw-config",
+                # Query cost grows with ef_search * m * log N. m=8 gives each
+                # node more neighbours, recovering the recall that a smaller
+                # ef_search gives up; ef_construction=200 still builds a good
+                # graph for well under 1M vectors at about half the cost.
                 parameters=HnswParameters(
-                    m=4,
-                    ef_construction=400,
-                    ef_search=500,
+                    m=8,
+                    ef_construction=200,
+                    ef_search=100,
                     metric="cosine",
                 ),
             ),
@@ -13,29 +13,139 @@ import argparse
 import logging
 import os
 import sys
+import threading
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
 
 # Add parent directory to path for shared imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from pypdf import PdfReader
 
-from shared.chunking import semantic_chunk
+try:
+    import pymupdf
+except ImportError:
+    # Optional: fall back to pure-Python pypdf
+    pymupdf = None
+
+from shared.chunking import Chunk, semantic_chunk_stream
+from shared.dedup import KeptVectors, near_duplicate_mask
 from shared.embedding import generate_embeddings
-from shared.indexing import upsert_chunks
+from shared.indexing import get_search_client, upsert_chunks
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
 
 
-def extract_text_from_pdf(file_path: str) -> str:
-    """Extract text from a PDF using pypdf."""
+# Chunks handed to each embedding call (the per-request input limit)
+EMBED_BATCH_SIZE = 2048
+
+# Worker processes for PDF text extraction
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+
+# Pages extracted per worker task; each task re-opens the PDF once
+PAGES_PER_TASK = 16
+
+# Cosine similarity above which a chunk duplicates an earlier one (1 disables)
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.98"))
+
+# Chunk batches between the chunker and a finished upsert; once this many
+# are in flight, chunking waits for the oldest upsert, bounding the chunks
+# and embeddings held in the pipeline. (Dedup state still grows with the
+# number of kept chunks; see ingest_document.)
+# In-flight batches embed concurrently: one batch of 2048 chunks packs into
+# only one or two embedding requests, so embedding a single batch at a
+# time would leave EMBEDDING_CONCURRENCY unused.
+MAX_IN_FLIGHT_BATCHES = 4
+
+
+def extract_text_from_pdf(
+    file_path: str, workers: int = EXTRACT_WORKERS
+) -> Iterator[tuple[int, str]]:
+    """
+    Lazily extract (page_number, text) from a PDF, in page order.
+
+    Uses PyMuPDF (C-backed, much faster on large documents) when it is
+    installed, otherwise falls back to pypdf. Documents longer than one
+    task are split into page ranges extracted in parallel by up to
+    ``workers`` processes.
+    """
+    page_count = _page_count(file_path)
+    if workers <= 1 or page_count <= PAGES_PER_TASK:
+        yield from _extract_page_range(file_path, 0, page_count)
+        return
+
+    ranges = (
+        (start, min(start + PAGES_PER_TASK, page_count))
+        for start in range(0, page_count, PAGES_PER_TASK)
+    )
+    # Keep at most 2 * workers ranges submitted, so extracted text is held
+    # only a little ahead of the consumer rather than for the whole PDF.
+    window = 2 * workers
+    pending: deque[Future[list[tuple[int, str]]]] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            for page_range in islice(ranges, window):
+                pending.append(pool.submit(_extract_page_range, file_path, *page_range))
+            while pending:
+                # Ranges are consumed in submission order, so pages stay in order
+                pages = pending.popleft().result()
+                next_range = next(ranges, None)
+                if next_range is not None:
+                    pending.append(pool.submit(_extract_page_range, file_path, *next_range))
+                yield from pages
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _page_count(file_path: str) -> int:
+    """Return the number of pages in a PDF."""
+    if pymupdf is None:
+        return len(PdfReader(file_path).pages)
+    with pymupdf.open(file_path) as doc:
+        return doc.page_count
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> list[tuple[int, str]]:
+    """Extract (page_number, text) for non-empty pages start..stop-1."""
+    if pymupdf is None:
+        return _extract_page_range_with_pypdf(file_path, start, stop)
+
+    pages = []
+    with pymupdf.open(file_path) as doc:
+        for i in range(start, stop):
+            text = doc[i].get_text("text")
+            if text.strip():
+                pages.append((i + 1, text))
+    return pages
+
+
+def _extract_page_range_with_pypdf(
+    file_path: str, start: int, stop: int
+) -> list[tuple[int, str]]:
+    """Extract (page_number, text) for non-empty pages start..stop-1 using pypdf."""
     reader = PdfReader(file_path)
     pages = []
-    for i, page in enumerate(reader.pages):
-        text = page.extract_text()
+    for i in range(start, stop):
+        text = reader.pages[i].extract_text()
         if text:
-            pages.append(f"## Page {i + 1}\n\n{text}")
-    return "\n\n".join(pages)
+            pages.append((i + 1, text))
+    return pages
+
+
+def _batched(chunks: Iterator[Chunk], size: int) -> Iterator[list[Chunk]]:
+    """Group a chunk stream into lists of at most ``size`` chunks."""
+    batch: list[Chunk] = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
 
 def ingest_document(
@@ -47,10 +157,14 @@ def ingest_document(
     Full ingestion pipeline for a single document.
 
     Steps:
-    1. Extract text from PDF.
-    2. Chunk by headings with overlap.
+    1. Extract text from PDF, page by page.
+    2. Chunk by headings with overlap as pages arrive.
     3. Generate embeddings in batches.
-    4. Upsert to Azure AI Search index.
+    4. Drop near-duplicate chunks.
+    5. Upsert to Azure AI Search index.
+
+    The steps run as a pipeline: while one batch is being upserted, the
+    next is embedded and later pages are still being extracted and chunked.
     """
     if not os.path.exists(file_path):
         logger.error("File not found: %s", file_path)
@@ -59,44 +173,94 @@ def ingest_document(
     filename = os.path.basename(file_path)
     logger.info("Starting ingestion for '%s'", filename)
 
-    # Step 1: Extract text
-    logger.info("Extracting text...")
-    text = extract_text_from_pdf(file_path)
-    logger.info("Extracted %d characters from %s", len(text), filename)
+    # Construct source URI (would be blob URL in production)
+    source_uri = f"https://storage.blob.core.windows.net/policy-docs/{filename}"
+    client = get_search_client()
 
-    if not text.strip():
-        logger.warning("No text extracted from '%s'. Skipping.", filename)
-        return
+    # Written only from the single uploader thread, one batch at a time.
+    # Dedup compares each batch against every chunk kept so far, so this
+    # state grows with the document: float16 unit vectors, about 3 KB per
+    # kept 1536-dimension chunk.
+    kept_vectors = KeptVectors()
+    next_index = 0
+    # Set on the first failure so queued batches are not upserted under
+    # chunk IDs that belong to the batch that failed
+    failed = threading.Event()
 
-    # Step 2: Chunk
-    logger.info("Chunking text...")
-    chunks = semantic_chunk(text, max_chunk_size=1000, overlap=100, source_file=filename)
-    logger.info("Created %d chunks", len(chunks))
+    def dedup_and_upsert(batch: list[Chunk], embedding: Future) -> int:
+        """Steps 4-5 for one batch, once its embeddings are ready."""
+        nonlocal next_index
+        if failed.is_set():
+            raise RuntimeError("Skipped after an earlier batch failed")
+        try:
+            vectors = embedding.result()
 
-    # Step 3: Embed
-    logger.info("Generating embeddings...")
-    chunk_texts = [c.text for c in chunks]
-    vectors = generate_embeddings(chunk_texts, batch_size=16)
+            keep = near_duplicate_mask(vectors, DEDUP_THRESHOLD, kept_vectors.vectors)
+            if not keep.all():
+                batch = [chunk for chunk, kept in zip(batch, keep) if kept]
+                vectors = vectors[keep]
+                logger.info("Dropped %d near-duplicate chunks", len(keep) - len(batch))
 
-    # Step 4: Upsert
-    logger.info("Upserting to search index...")
-    chunk_dicts = [{"text": c.text, "metadata": c.metadata} for c in chunks]
+            start_index = next_index
+            next_index += len(batch)
+            kept_vectors.extend(vectors)
 
-    # Construct source URI (would be blob URL in production)
-    source_uri = f"https://storage.blob.core.windows.net/policy-docs/{filename}"
+            return upsert_chunks(
+                chunks=[{"text": c.text, "metadata": c.metadata} for c in batch],
+                vectors=vectors,
+                source_uri=source_uri,
+                title=filename,
+                allowed_groups=allowed_groups or ["all-employees"],
+                classification=classification,
+                start_index=start_index,
+                client=client,
+            )
+        except BaseException:
+            failed.set()
+            raise
 
-    succeeded = upsert_chunks(
-        chunks=chunk_dicts,
-        vectors=vectors,
-        source_uri=source_uri,
-        title=filename,
-        allowed_groups=allowed_groups or ["all-employees"],
-        classification=classification,
+    # Pages flow into the chunker lazily. Full batches of chunks are embedded
+    # concurrently on worker threads and upserted in order on another, so
+    # extraction, embedding and upload of different batches overlap.
+    logger.info("Extracting, chunking, embedding and upserting...")
+    pages = (
+        f"## Page {page_no}\n\n{text}"
+        for page_no, text in extract_text_from_pdf(file_path)
+    )
+    chunk_stream = semantic_chunk_stream(
+        pages, max_chunk_size=1000, overlap=100, source_file=filename
     )
 
+    chunk_count = 0
+    succeeded = 0
+    in_flight: deque[Future] = deque()
+    with (
+        ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT_BATCHES) as embedder,
+        ThreadPoolExecutor(max_workers=1) as uploader,
+    ):
+        try:
+            for batch in _batched(chunk_stream, EMBED_BATCH_SIZE):
+                if len(in_flight) >= MAX_IN_FLIGHT_BATCHES:
+                    succeeded += in_flight.popleft().result()
+                chunk_count += len(batch)
+                embedding = embedder.submit(generate_embeddings, [c.text for c in batch])
+                in_flight.append(uploader.submit(dedup_and_upsert, batch, embedding))
+            while in_flight:
+                succeeded += in_flight.popleft().result()
+        except BaseException:
+            # Stop the pipeline: drop queued embeddings and upserts
+            failed.set()
+            embedder.shutdown(cancel_futures=True)
+            uploader.shutdown(cancel_futures=True)
+            raise
+
+    if not chunk_count:
+        logger.warning("No text extracted from '%s'. Skipping.", filename)
+        return
+
     logger.info(
-        "Ingestion complete: %d/%d chunks indexed for '%s'",
-        succeeded, len(chunks), filename,
+        "Ingestion complete: %d/%d chunks indexed for '%s' (%d created)",
+        succeeded, next_index, filename, chunk_count,
     )
 
 
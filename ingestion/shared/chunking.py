@@ -6,8 +6,13 @@ Falls back to recursive character splitting for oversized sections.
 """
 
 import re
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass, field
 
+# Markdown heading line (#, ## or ###). Whitespace after the hashes must stay
+# on the same line, so a bare "##" line never swallows the following line.
+_HEADING_RE = re.compile(r"(?m)^(#{1,3})[ \t]+(.+)$")
+
 
 @dataclass
 class Chunk:
@@ -42,13 +47,35 @@ def semantic_chunk(
     Returns:
         List of Chunk objects with text and metadata.
     """
-    sections = _split_by_headings(text)
-    chunks: list[Chunk] = []
+    return list(semantic_chunk_stream([text], max_chunk_size, overlap, source_file))
+
+
+def semantic_chunk_stream(
+    pages: Iterable[str],
+    max_chunk_size: int = 1000,
+    overlap: int = 100,
+    source_file: str = "",
+) -> Iterator[Chunk]:
+    """
+    Lazily chunk a document supplied page by page.
+
+    Produces the same chunks as ``semantic_chunk`` on the pages joined with
+    blank lines, but only holds the section currently being read, so chunks
+    are emitted as soon as the next heading closes their section.
+
+    Args:
+        pages: Page texts in document order.
+        max_chunk_size: Maximum characters per chunk.
+        overlap: Character overlap between consecutive sub-chunks.
+        source_file: Original file name for metadata.
+
+    Yields:
+        Chunk objects with text, metadata and a running chunk index.
+    """
     chunk_idx = 0
 
-    for section in sections:
-        heading = section["heading"]
-        content = section["content"].strip()
+    for heading, content in _iter_sections(pages):
+        content = content.strip()
         if not content:
             continue
 
@@ -56,90 +83,123 @@ def semantic_chunk(
         prefix = f"[{heading}] " if heading else ""
 
         if len(content) <= max_chunk_size:
-            chunks.append(
-                Chunk(
-                    text=prefix + content,
-                    metadata={
-                        "heading": heading,
-                        "source_file": source_file,
-                    },
-                    chunk_index=chunk_idx,
-                )
-            )
-            chunk_idx += 1
+            pieces = [content]
         else:
             # Recursively split oversized sections
-            sub_chunks = _recursive_split(content, max_chunk_size, overlap)
-            for sub in sub_chunks:
-                chunks.append(
-                    Chunk(
-                        text=prefix + sub,
-                        metadata={
-                            "heading": heading,
-                            "source_file": source_file,
-                        },
-                        chunk_index=chunk_idx,
-                    )
-                )
-                chunk_idx += 1
-
-    return chunks
+            pieces = _recursive_split(content, max_chunk_size, overlap)
+
+        for piece in pieces:
+            yield Chunk(
+                text=prefix + piece,
+                metadata={
+                    "heading": heading,
+                    "source_file": source_file,
+                },
+                chunk_index=chunk_idx,
+            )
+            chunk_idx += 1
 
 
 def _split_by_headings(text: str) -> list[dict]:
     """Split text into sections by markdown headings (## or ###)."""
-    pattern = re.compile(r"^(#{1,3})\s+(.+)$", re.MULTILINE)
-    sections: list[dict] = []
-    last_end = 0
-    current_heading = ""
+    return [
+        {"heading": heading, "content": content}
+        for heading, content in _iter_sections([text])
+    ]
 
-    for match in pattern.finditer(text):
-        # Capture content before this heading
-        content = text[last_end : match.start()]
-        if content.strip():
-            sections.append({"heading": current_heading, "content": content})
 
-        current_heading = match.group(2).strip()
-        last_end = match.end()
+def _iter_sections(pages: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """
+    Yield (heading, content) sections across page boundaries.
+
+    A section that runs past the end of a page stays open and continues
+    with the next page; pages are joined with a blank line.
+    """
+    current_heading = ""
+    parts: list[str] = []
+    # Pages seen before the first section; only kept until one is found
+    unsectioned: list[str] | None = []
+
+    for page in pages:
+        if unsectioned is not None:
+            unsectioned.append(page)
+
+        last_end = 0
+        for match in _iter_headings(page):
+            start, end = match.span()
+            # Capture content before this heading
+            parts.append(page[last_end:start])
+            content = "\n\n".join(parts)
+            if content.strip():
+                unsectioned = None
+                yield current_heading, content
+
+            current_heading = match.group(2).strip()
+            parts = []
+            last_end = end
+
+        parts.append(page[last_end:])
 
     # Capture remaining content
-    remaining = text[last_end:]
-    if remaining.strip():
-        sections.append({"heading": current_heading, "content": remaining})
+    content = "\n\n".join(parts)
+    if content.strip():
+        yield current_heading, content
+    elif unsectioned is not None:
+        # If no headings found, return the entire text as one section
+        yield "", "\n\n".join(unsectioned)
+
+
+def _iter_headings(page: str) -> Iterator[re.Match[str]]:
+    """
+    Yield heading matches in a page, like ``_HEADING_RE.finditer``.
 
-    # If no headings found, return the entire text as one section
-    if not sections:
-        sections.append({"heading": "", "content": text})
+    Headings can only start at a line beginning with "#", so candidate
+    lines are located with ``str.find`` (a C substring search) and the
+    regex only runs there, instead of being tried at every line start.
+    """
+    match = _HEADING_RE.match
+    if page.startswith("#"):
+        heading = match(page)
+        if heading:
+            yield heading
 
-    return sections
+    pos = page.find("\n#")
+    while pos != -1:
+        heading = match(page, pos + 1)
+        if heading:
+            yield heading
+        pos = page.find("\n#", pos + 1)
 
 
 def _recursive_split(
     text: str, max_size: int, overlap: int
 ) -> list[str]:
     """Split text by paragraph boundaries with overlap."""
-    paragraphs = text.split("\n\n")
+    # Strip paragraphs and drop empty ones lazily, without a per-item branch
+    paragraphs = filter(None, map(str.strip, text.split("\n\n")))
     chunks: list[str] = []
-    current = ""
+    # Paragraphs of the chunk being built, and the length of their join
+    parts: list[str] = []
+    current_len = 0
 
     for para in paragraphs:
-        para = para.strip()
-        if not para:
-            continue
-
-        if len(current) + len(para) + 2 <= max_size:
-            current = f"{current}\n\n{para}" if current else para
+        if current_len + len(para) + 2 <= max_size:
+            current_len += len(para) + 2 if parts else len(para)
+            parts.append(para)
         else:
-            if current:
+            if parts:
+                current = "\n\n".join(parts)
                 chunks.append(current)
             # Start new chunk with overlap from previous
-            if overlap > 0 and current:
+            if overlap > 0 and parts:
                 overlap_text = current[-overlap:]
-                current = overlap_text + "\n\n" + para
+                parts = [overlap_text, para]
+                current_len = len(overlap_text) + 2 + len(para)
             else:
-                current = para
+                parts = [para]
+                current_len = len(para)
 
-    if current:
-        chunks.append(current)
+    if parts:
+        chunks.append("\n\n".join(parts))
 
     return chunks
@@ -0,0 +1,117 @@
+"""
+Near-duplicate detection for embedded chunks.
+
+Policy documents repeat boilerplate (definitions, disclaimers) across
+sections. Chunks whose embeddings are nearly identical to an earlier chunk
+add index size and query-time work without adding retrievable content.
+"""
+
+import numpy as np
+
+# Rows of the similarity matrix computed per matmul, bounding peak memory
+_BLOCK_SIZE = 1024
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length (zero rows stay zero)."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, np.finfo(np.float32).tiny)
+
+
+class KeptVectors:
+    """
+    Unit vectors of the chunks kept so far, stored as float16.
+
+    Rows are normalised once on the way in and appended to a preallocated
+    buffer that doubles when full, so each batch costs O(batch) to add
+    rather than a copy of everything kept. Memory still grows with the
+    number of kept chunks, at 2 bytes per dimension each.
+    """
+
+    def __init__(self, capacity: int = _BLOCK_SIZE):
+        self._capacity = capacity
+        self._buffer: np.ndarray | None = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def vectors(self) -> np.ndarray | None:
+        """View of the stored unit vectors, or None when nothing is kept."""
+        if self._buffer is None:
+            return None
+        return self._buffer[: self._size]
+
+    def extend(self, vectors: np.ndarray) -> None:
+        """Normalise and append an embedding matrix, one chunk per row."""
+        if not len(vectors):
+            return
+        if self._buffer is None:
+            capacity = max(self._capacity, len(vectors))
+            self._buffer = np.empty((capacity, vectors.shape[1]), dtype=np.float16)
+
+        needed = self._size + len(vectors)
+        if needed > len(self._buffer):
+            capacity = len(self._buffer)
+            while capacity < needed:
+                capacity *= 2
+            grown = np.empty((capacity, self._buffer.shape[1]), dtype=np.float16)
+            grown[: self._size] = self._buffer[: self._size]
+            self._buffer = grown
+
+        self._buffer[self._size : needed] = normalize(vectors)
+        self._size = needed
+
+
+def near_duplicate_mask(
+    vectors: np.ndarray,
+    threshold: float = 0.98,
+    kept: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Flag which chunks to keep, dropping near-duplicates of earlier chunks.
+
+    A chunk is dropped when its cosine similarity to an earlier kept chunk
+    exceeds ``threshold``, so the first occurrence always survives.
+
+    Args:
+        vectors: Embedding matrix with one chunk per row.
+        threshold: Cosine similarity above which chunks count as duplicates.
+            Values of 1 or more disable deduplication.
+        kept: Unit vectors of chunks kept from earlier batches of the same
+            document (see ``KeptVectors``), which every row is also
+            compared against. They are used as given, not renormalised.
+
+    Returns:
+        Boolean mask over ``vectors`` with True for every chunk to keep.
+    """
+    keep = np.ones(len(vectors), dtype=bool)
+    if not len(keep) or threshold >= 1:
+        return keep
+
+    unit = normalize(vectors)
+
+    # Rows too similar to a chunk kept from an earlier batch are dropped
+    # outright; kept rows are upcast block by block for the matmul
+    if kept is not None:
+        for start in range(0, len(kept), _BLOCK_SIZE):
+            block = kept[start : start + _BLOCK_SIZE].astype(np.float32)
+            keep &= ~(unit @ block.T > threshold).any(axis=1)
+
+    # Earlier rows of this batch each row is too similar to, found block by block
+    candidates: dict[int, list[int]] = {}
+    for start in range(0, len(keep), _BLOCK_SIZE):
+        stop = start + _BLOCK_SIZE
+        sims = unit[start:stop] @ unit[:stop].T
+        rows, cols = np.nonzero(sims > threshold)
+        rows += start
+        earlier = cols < rows
+        for row, col in zip(rows[earlier].tolist(), cols[earlier].tolist()):
+            candidates.setdefault(row, []).append(col)
+
+    # Greedy pass in document order: only rows with candidates need a look
+    for row in sorted(candidates):
+        if keep[row] and keep[candidates[row]].any():
+            keep[row] = False
+    return keep
@@ -2,13 +2,26 @@
 Embedding module for batch vector generation.
 
 Uses Azure OpenAI text-embedding-3-small model via DefaultAzureCredential.
+Batches are embedded concurrently with the async client.
 """
 
+import asyncio
 import logging
 import os
+from collections.abc import Callable
+from functools import lru_cache
 
+import numpy as np
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI
+
+from shared.embedding_cache import EmbeddingCache, cache_key
+
+try:
+    import tiktoken
+except ImportError:
+    # Optional: fall back to UTF-8 byte counts, an upper bound on BPE tokens
+    tiktoken = None
 
 logger = logging.getLogger(__name__)
 
@@ -18,51 +31,193 @@ EMBEDDING_DEPLOYMENT = os.getenv(
     "AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "text-embedding-3-small"
 )
 API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-06-01")
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "8"))
+# Path of the on-disk embedding cache; set to empty to disable caching
+EMBED_CACHE = os.getenv("EMBED_CACHE", "embed_cache.db")
+
+# Maximum number of inputs per embeddings request
+MAX_BATCH_SIZE = 2048
+
+# Maximum tokens per input, and across all inputs of one request
+MAX_INPUT_TOKENS = 8191
+MAX_BATCH_TOKENS = 300_000
+
+# Tokenizer of the text-embedding-3 models
+TOKEN_ENCODING = "cl100k_base"
 
 
-def get_openai_client() -> AzureOpenAI:
-    """Create an Azure OpenAI client with Entra ID auth."""
-    token_provider = get_bearer_token_provider(
+@lru_cache(maxsize=1)
+def _get_token_provider() -> Callable[[], str]:
+    """
+    Build the Entra ID token provider once per process.
+
+    The sync provider caches its token and is safe to call from any
+    thread or event loop, so every ``asyncio.run`` in
+    ``generate_embeddings`` reuses it instead of creating a credential.
+    """
+    return get_bearer_token_provider(
         DefaultAzureCredential(),
         "https://cognitiveservices.azure.com/.default",
     )
-    return AzureOpenAI(
+
+
+def get_openai_client() -> AsyncAzureOpenAI:
+    """Create an async Azure OpenAI client with Entra ID auth."""
+    return AsyncAzureOpenAI(
         azure_endpoint=AZURE_OPENAI_ENDPOINT,
-        azure_ad_token_provider=token_provider,
+        azure_ad_token_provider=_get_token_provider(),
         api_version=API_VERSION,
     )
 
 
 def generate_embeddings(
     texts: list[str],
-    batch_size: int = 16,
-) -> list[list[float]]:
+    batch_size: int = MAX_BATCH_SIZE,
+    concurrency: int = EMBEDDING_CONCURRENCY,
+) -> np.ndarray:
     """
     Generate embedding vectors for a list of texts.
 
-    Processes in batches to avoid API limits.
+    Texts already embedded by a previous run are served from the on-disk
+    cache (see ``EMBED_CACHE``). The remaining texts are packed into
+    batches that respect the per-request item and token limits, and up to
+    ``concurrency`` batches are embedded at a time, so
+    total wall time tracks the slowest batches rather than the sum of all
+    round-trips.
 
     Args:
         texts: List of text strings to embed.
-        batch_size: Number of texts per API call.
+        batch_size: Maximum number of texts per API call.
+        concurrency: Maximum number of in-flight API calls.
 
     Returns:
-        List of embedding vectors (same order as input).
+        float32 matrix with one embedding per row (same order as input).
     """
-    client = get_openai_client()
-    all_embeddings: list[list[float]] = []
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
 
-    for i in range(0, len(texts), batch_size):
-        batch = texts[i : i + batch_size]
-        logger.info("Embedding batch %d/%d (%d items)", i // batch_size + 1,
-                     (len(texts) + batch_size - 1) // batch_size, len(batch))
+    cache = EmbeddingCache(EMBED_CACHE) if EMBED_CACHE else None
+    try:
+        keys = [cache_key(EMBEDDING_DEPLOYMENT, text) for text in texts]
+        vectors_by_key = cache.get_many(keys) if cache else {}
 
-        response = client.embeddings.create(
-            input=batch,
-            model=EMBEDDING_DEPLOYMENT,
+        # Unique texts that still need embedding, in first-seen order
+        pending = {k: t for k, t in zip(keys, texts) if k not in vectors_by_key}
+        logger.info(
+            "Embedding cache: %d hits, %d texts to embed.",
+            len(texts) - len(pending), len(pending),
         )
-        batch_embeddings = [item.embedding for item in response.data]
-        all_embeddings.extend(batch_embeddings)
 
+        if pending:
+            miss_keys = list(pending)
+            miss_texts = list(pending.values())
+            batches = _pack_batches(miss_texts, batch_size, MAX_BATCH_TOKENS)
+            batch_results = asyncio.run(_embed_batches(batches, concurrency))
+
+            # gather() returns results in submission order, so keys line up
+            new_vectors = np.concatenate(batch_results)
+            vectors_by_key.update(zip(miss_keys, new_vectors))
+            if cache:
+                cache.put_many(zip(miss_keys, new_vectors))
+    finally:
+        if cache:
+            cache.close()
+
+    all_embeddings = np.stack([vectors_by_key[key] for key in keys])
     logger.info("Generated %d embeddings total.", len(all_embeddings))
     return all_embeddings
+
+
+@lru_cache(maxsize=1)
+def _get_encoding() -> "tiktoken.Encoding | None":
+    """
+    Load the tokenizer, or None to fall back to UTF-8 byte counts.
+
+    tiktoken downloads the BPE file on first use unless it is already in
+    its cache (TIKTOKEN_CACHE_DIR), which fails on offline workers.
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(TOKEN_ENCODING)
+    except (OSError, ValueError) as exc:
+        # Download failures (requests errors subclass OSError) or a corrupt cache
+        logger.warning(
+            "Could not load the %s tokenizer (%s); counting bytes instead.",
+            TOKEN_ENCODING, exc,
+        )
+        return None
+
+
+def _pack_batches(
+    texts: list[str], max_items: int, max_tokens: int
+) -> list[list[str]]:
+    """
+    Pack texts into as few batches as the request limits allow.
+
+    A new batch starts when adding the next text would exceed either
+    ``max_items`` inputs or ``max_tokens`` total tokens. Texts longer
+    than ``MAX_INPUT_TOKENS`` are truncated so the request is not rejected.
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        token_counts = [len(text.encode()) for text in texts]
+    else:
+        tokens = encoding.encode_ordinary_batch(texts)
+        token_counts = [len(t) for t in tokens]
+
+    batches: list[list[str]] = []
+    batch: list[str] = []
+    batch_tokens = 0
+    for i, (text, count) in enumerate(zip(texts, token_counts)):
+        if count > MAX_INPUT_TOKENS:
+            logger.warning(
+                "Truncating embedding input of %d tokens to %d.", count, MAX_INPUT_TOKENS
+            )
+            if encoding is None:
+                text = text.encode()[:MAX_INPUT_TOKENS].decode(errors="ignore")
+            else:
+                text = encoding.decode(tokens[i][:MAX_INPUT_TOKENS])
+            count = MAX_INPUT_TOKENS
+
+        if batch and (len(batch) == max_items or batch_tokens + count > max_tokens):
+            batches.append(batch)
+            batch = []
+            batch_tokens = 0
+        batch.append(text)
+        batch_tokens += count
+
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+async def _embed_batches(
+    batches: list[list[str]],
+    concurrency: int,
+) -> list[np.ndarray]:
+    """Embed all batches with one client, bounded by a semaphore."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with get_openai_client() as client:
+
+        async def bounded(index: int, batch: list[str]) -> np.ndarray:
+            async with semaphore:
+                logger.info(
+                    "Embedding batch %d/%d (%d items)",
+                    index + 1, len(batches), len(batch),
+                )
+                return await _embed_batch(client, batch)
+
+        return await asyncio.gather(
+            *(bounded(i, batch) for i, batch in enumerate(batches))
+        )
+
+
+async def _embed_batch(client: AsyncAzureOpenAI, batch: list[str]) -> np.ndarray:
+    """Embed a single batch of texts into a float32 matrix."""
+    response = await client.embeddings.create(
+        input=batch,
+        model=EMBEDDING_DEPLOYMENT,
+    )
+    return np.array([item.embedding for item in response.data], dtype=np.float32)
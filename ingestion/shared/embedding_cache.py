@@ -0,0 +1,66 @@
+"""
+Persistent on-disk cache for embedding vectors.
+
+Re-ingesting a document re-embeds every chunk even when most chunks are
+unchanged. This cache stores vectors in a local SQLite file keyed by
+SHA-256(model + text), so unchanged chunks are loaded from disk instead of
+being sent to Azure OpenAI. Vectors are stored as float16 to halve the
+cache size.
+"""
+
+import hashlib
+import sqlite3
+from collections.abc import Iterable
+
+import numpy as np
+
+# Keep IN (...) queries under SQLite's bound-parameter limit
+_QUERY_CHUNK_SIZE = 500
+
+
+def cache_key(model: str, text: str) -> bytes:
+    """Derive the cache key for a text embedded with the given model."""
+    return hashlib.sha256(f"{model}\x00{text}".encode()).digest()
+
+
+class EmbeddingCache:
+    """SQLite-backed map from cache key to embedding vector."""
+
+    def __init__(self, path: str) -> None:
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key BLOB PRIMARY KEY, vec BLOB NOT NULL)"
+        )
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, np.ndarray]:
+        """
+        Look up vectors for the given keys.
+
+        Returns:
+            Mapping of key to float32 vector for every key found in the cache.
+        """
+        found: dict[bytes, np.ndarray] = {}
+        for i in range(0, len(keys), _QUERY_CHUNK_SIZE):
+            chunk = keys[i : i + _QUERY_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, vec FROM cache WHERE key IN ({placeholders})", chunk
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+        return found
+
+    def put_many(self, items: Iterable[tuple[bytes, np.ndarray | list[float]]]) -> None:
+        """Store vectors, replacing any existing entries with the same key."""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, vec) VALUES (?, ?)",
+                (
+                    (key, np.asarray(vector, dtype=np.float16).tobytes())
+                    for key, vector in items
+                ),
+            )
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
@@ -4,7 +4,13 @@ Unit tests for the semantic chunking module.
 
 import pytest
 
-from shared.chunking import Chunk, semantic_chunk, _split_by_headings, _recursive_split
+from shared.chunking import (
+    Chunk,
+    semantic_chunk,
+    semantic_chunk_stream,
+    _split_by_headings,
+    _recursive_split,
+)
 
 
 class TestSemanticChunk:
@@ -46,6 +52,26 @@ class TestSemanticChunk:
         assert chunks[0].metadata["source_file"] == "test.pdf"
 
 
+class TestSemanticChunkStream:
+    def test_matches_joined_document(self):
+        """Streaming pages should chunk exactly like the joined text."""
+        pages = [
+            "## Page 1\n\nIntro.\n\n# Scope\n\nApplies",
+            "to everyone.\n\n## Rules\n\nBe safe.",
+        ]
+        streamed = list(semantic_chunk_stream(pages, max_chunk_size=1000))
+        joined = semantic_chunk("\n\n".join(pages), max_chunk_size=1000)
+        assert [(c.text, c.chunk_index) for c in streamed] == [
+            (c.text, c.chunk_index) for c in joined
+        ]
+
+    def test_section_continues_across_pages(self):
+        """A section without a heading on the next page should stay open."""
+        chunks = list(semantic_chunk_stream(["## Scope\n\nApplies", "to everyone."]))
+        assert len(chunks) == 1
+        assert chunks[0].text == "[Scope] Applies\n\nto everyone."
+
+
 class TestSplitByHeadings:
     def test_multiple_heading_levels(self):
         text = "# H1\n\nContent 1\n\n## H2\n\nContent 2\n\n### H3\n\nContent 3"
@@ -57,6 +83,16 @@ class TestSplitByHeadings:
         sections = _split_by_headings(text)
         assert len(sections) == 1
 
+    def test_bare_hashes_do_not_capture_next_line(self):
+        text = "## Real\n\n##\nBody text"
+        sections = _split_by_headings(text)
+        assert sections == [{"heading": "Real", "content": "\n\n##\nBody text"}]
+
+    def test_only_line_start_hashes_open_sections(self):
+        text = "Intro # not a heading\n#tag\n#### Too deep\n## Scope\nBody"
+        sections = _split_by_headings(text)
+        assert [s["heading"] for s in sections] == ["", "Scope"]
+
 
 class TestRecursiveSplit:
     def test_splits_by_paragraphs(self):
@@ -0,0 +1,60 @@
+"""
+Unit tests for near-duplicate chunk detection.
+"""
+
+import numpy as np
+
+from shared.dedup import KeptVectors, near_duplicate_mask
+
+
+class TestNearDuplicateMask:
+    def test_keeps_first_occurrence(self):
+        vectors = np.array(
+            [[1.0, 0.0], [0.0, 1.0], [2.0, 0.0], [0.0, 1.0]], dtype=np.float32
+        )
+
+        keep = near_duplicate_mask(vectors)
+
+        assert keep.tolist() == [True, True, False, False]
+
+    def test_distinct_vectors_are_kept(self):
+        vectors = np.array([[1.0, 0.0], [1.0, 1.0], [0.0, 1.0]], dtype=np.float32)
+
+        assert near_duplicate_mask(vectors).all()
+
+    def test_duplicate_of_dropped_chunk_is_compared_to_kept_chunks(self):
+        """A chain a≈b≈c keeps c when it is only close to the dropped b."""
+        vectors = np.array([[1.0, 0.0], [1.0, 0.27], [1.0, 0.58]], dtype=np.float32)
+
+        keep = near_duplicate_mask(vectors, threshold=0.95)
+
+        assert keep.tolist() == [True, False, True]
+
+    def test_threshold_of_one_disables(self):
+        vectors = np.ones((3, 4), dtype=np.float32)
+
+        assert near_duplicate_mask(vectors, threshold=1.0).all()
+
+    def test_compares_against_kept_vectors(self):
+        kept = KeptVectors()
+        kept.extend(np.array([[3.0, 0.0]], dtype=np.float32))
+        vectors = np.array([[1.0, 0.01], [0.0, 1.0], [0.0, 2.0]], dtype=np.float32)
+
+        keep = near_duplicate_mask(vectors, kept=kept.vectors)
+
+        assert keep.tolist() == [False, True, False]
+
+
+class TestKeptVectors:
+    def test_grows_and_stores_unit_vectors(self):
+        kept = KeptVectors(capacity=2)
+        assert kept.vectors is None
+
+        for _ in range(3):
+            kept.extend(np.array([[3.0, 4.0], [0.0, 2.0]], dtype=np.float32))
+
+        assert len(kept) == 6
+        assert kept.vectors.dtype == np.float16
+        np.testing.assert_allclose(
+            kept.vectors, np.tile([[0.6, 0.8], [0.0, 1.0]], (3, 1)), atol=1e-3
+        )
@@ -0,0 +1,57 @@
+"""
+Unit tests for embedding batch packing.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from shared import embedding
+from shared.embedding import _pack_batches
+
+
+@pytest.fixture(autouse=True)
+def byte_token_counts(monkeypatch):
+    """Count tokens as UTF-8 bytes so results do not depend on tiktoken."""
+    monkeypatch.setattr(embedding, "tiktoken", None)
+    embedding._get_encoding.cache_clear()
+    yield
+    embedding._get_encoding.cache_clear()
+
+
+class TestPackBatches:
+    def test_splits_on_item_limit(self):
+        batches = _pack_batches(["a"] * 5, max_items=2, max_tokens=100)
+
+        assert [len(b) for b in batches] == [2, 2, 1]
+
+    def test_splits_on_token_limit(self):
+        batches = _pack_batches(["a" * 40] * 5, max_items=100, max_tokens=100)
+
+        assert [len(b) for b in batches] == [2, 2, 1]
+
+    def test_preserves_order(self):
+        texts = [str(i) for i in range(10)]
+
+        batches = _pack_batches(texts, max_items=3, max_tokens=100)
+
+        assert [t for batch in batches for t in batch] == texts
+
+    def test_truncates_oversized_input(self, monkeypatch):
+        monkeypatch.setattr(embedding, "MAX_INPUT_TOKENS", 8)
+
+        batches = _pack_batches(["x" * 20, "y"], max_items=10, max_tokens=100)
+
+        assert batches == [["x" * 8, "y"]]
+
+    def test_falls_back_to_bytes_when_tokenizer_fails_to_load(self, monkeypatch):
+        def offline(name):
+            raise OSError("no network")
+
+        monkeypatch.setattr(
+            embedding, "tiktoken", SimpleNamespace(get_encoding=offline)
+        )
+
+        batches = _pack_batches(["a" * 40] * 3, max_items=100, max_tokens=100)
+
+        assert [len(b) for b in batches] == [2, 1]
@@ -0,0 +1,41 @@
+"""
+Unit tests for the on-disk embedding cache.
+"""
+
+from shared.embedding_cache import EmbeddingCache, cache_key
+
+
+class TestEmbeddingCache:
+    def test_round_trip_as_float16(self, tmp_path):
+        """Stored vectors should come back with float16 precision."""
+        cache = EmbeddingCache(str(tmp_path / "cache.db"))
+        key = cache_key("model", "text")
+        cache.put_many([(key, [0.1, -0.5, 1.0])])
+
+        found = cache.get_many([key])
+
+        assert found[key].tolist() == [0.0999755859375, -0.5, 1.0]
+        cache.close()
+
+    def test_missing_keys_are_omitted(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path / "cache.db"))
+        cache.put_many([(cache_key("model", "a"), [1.0])])
+
+        found = cache.get_many([cache_key("model", "a"), cache_key("model", "b")])
+
+        assert list(found) == [cache_key("model", "a")]
+        cache.close()
+
+    def test_persists_across_connections(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        key = cache_key("model", "text")
+        cache = EmbeddingCache(path)
+        cache.put_many([(key, [2.0])])
+        cache.close()
+
+        reopened = EmbeddingCache(path)
+        assert reopened.get_many([key])[key].tolist() == [2.0]
+        reopened.close()
+
+    def test_key_depends_on_model(self):
+        assert cache_key("model-a", "text") != cache_key("model-b", "text")
@@ -0,0 +1,149 @@
+"""
+Unit tests for the indexing helpers.
+"""
+
+import base64
+import hashlib
+
+import numpy as np
+import orjson
+import pytest
+
+from shared import indexing
+from shared.indexing import generate_chunk_id, generate_chunk_ids, to_half_precision
+
+
+class TestChunkIds:
+    def test_matches_sha256_of_uri_and_index(self):
+        """IDs must stay stable so re-ingestion overwrites existing chunks."""
+        digest = hashlib.sha256(b"blob://docs/a.pdf_chunk_3").digest()
+        expected = base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+        assert generate_chunk_id("blob://docs/a.pdf", 3) == expected
+
+    def test_batch_matches_single(self):
+        ids = generate_chunk_ids("blob://docs/a.pdf", 0, 5)
+
+        assert ids == [generate_chunk_id("blob://docs/a.pdf", i) for i in range(5)]
+
+    def test_uri_scheme_hashes_uri_once(self, monkeypatch):
+        monkeypatch.setattr(indexing, "CHUNK_ID_HASH", "uri")
+
+        ids = generate_chunk_ids("blob://docs/a.pdf", 9, 11)
+
+        doc_hash = ids[0].rsplit("-", 1)[0]
+        assert len(doc_hash) == 16
+        assert ids == [f"{doc_hash}-9", f"{doc_hash}-10"]
+        assert generate_chunk_id("blob://docs/b.pdf", 9) != ids[0]
+
+
+class TestToHalfPrecision:
+    def test_round_trips_every_float16(self):
+        values = np.arange(2**16, dtype=np.uint16).view(np.float16)
+        values = values[np.isfinite(values)]
+
+        half = to_half_precision(values[np.newaxis, :])
+
+        assert np.array_equal(half[0].astype(np.float16), values)
+
+    def test_serializes_short_decimals(self):
+        half = to_half_precision(np.array([[0.1, -0.5, 1 / 3, 0.0]]))
+
+        body = orjson.dumps(list(half), option=orjson.OPT_SERIALIZE_NUMPY)
+
+        assert body == b"[[0.099976,-0.5,0.33325,0.0]]"
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, statuses: list[bool]):
+        self.status_code = status_code
+        self.content = orjson.dumps(
+            {"value": [{"key": str(i), "status": ok} for i, ok in enumerate(statuses)]}
+        )
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+class FakeSearchClient:
+    """Records raw index requests and answers with per-item statuses."""
+
+    def __init__(self, statuses: list[bool] | None = None, search_ids=()):
+        self.requests = []
+        self.statuses = statuses
+        self.search_ids = list(search_ids)
+
+    def send_request(self, request):
+        self.requests.append(request)
+        count = len(orjson.loads(request.content)["value"])
+        statuses = self.statuses or [True] * count
+        return FakeResponse(200 if all(statuses) else 207, statuses)
+
+    def search(self, **kwargs):
+        return [{"id": doc_id} for doc_id in self.search_ids]
+
+
+class TestIndexBatches:
+    @pytest.fixture(autouse=True)
+    def endpoint(self, monkeypatch):
+        monkeypatch.setattr(
+            indexing, "AZURE_SEARCH_ENDPOINT", "https://svc.search.windows.net"
+        )
+        monkeypatch.setattr(indexing, "SEARCH_INDEX_NAME", "idx")
+
+    def test_upsert_posts_orjson_index_batch(self):
+        client = FakeSearchClient()
+        vectors = np.array([[0.5, -0.25], [1.0, 0.0]], dtype=np.float32)
+        chunks = [{"text": "a", "metadata": {}}, {"text": "b", "metadata": {}}]
+
+        succeeded = indexing.upsert_chunks(
+            chunks, vectors, "blob://docs/a.pdf", "a.pdf", client=client
+        )
+
+        assert succeeded == 2
+        (request,) = client.requests
+        assert request.method == "POST"
+        assert request.url == (
+            "https://svc.search.windows.net/indexes('idx')/docs/search.index"
+            "?api-version=2024-07-01"
+        )
+        assert request.headers["Content-Type"] == "application/json"
+        docs = orjson.loads(request.content)["value"]
+        assert [d["@search.action"] for d in docs] == ["mergeOrUpload"] * 2
+        assert [d["content"] for d in docs] == ["a", "b"]
+        assert docs[0]["content_vector"] == [0.5, -0.25]
+        assert docs[1]["id"] == generate_chunk_id("blob://docs/a.pdf", 1)
+
+    def test_partial_success_counts_succeeded_items(self):
+        client = FakeSearchClient(statuses=[True, False, True])
+        vectors = np.zeros((3, 2), dtype=np.float32)
+        chunks = [{"text": "x", "metadata": {}}] * 3
+
+        succeeded = indexing.upsert_chunks(
+            chunks, vectors, "blob://docs/a.pdf", "a.pdf", client=client
+        )
+
+        assert succeeded == 2
+
+    def test_splits_into_batches(self, monkeypatch):
+        monkeypatch.setattr(indexing, "INDEX_BATCH_SIZE", 2)
+        client = FakeSearchClient()
+        documents = [{"@search.action": "delete", "id": str(i)} for i in range(5)]
+
+        assert indexing._run_batches(client, documents) == 5
+        sizes = sorted(len(orjson.loads(r.content)["value"]) for r in client.requests)
+        assert sizes == [1, 2, 2]
+
+    def test_delete_sends_delete_actions(self, monkeypatch):
+        client = FakeSearchClient(search_ids=["id-1", "id-2"])
+        monkeypatch.setattr(indexing, "get_search_client", lambda: client)
+
+        deleted = indexing.delete_document_chunks("blob://docs/a.pdf")
+
+        assert deleted == 2
+        (request,) = client.requests
+        assert orjson.loads(request.content)["value"] == [
+            {"@search.action": "delete", "id": "id-1"},
+            {"@search.action": "delete", "id": "id-2"},
+        ]